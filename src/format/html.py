@@ -1,7 +1,8 @@
-from jinja2 import Template
+import os, functools
+from jinja2 import Environment, DictLoader, FileSystemBytecodeCache, Template
 from datetime import datetime
 
-HTML_TMPL = Template("""
+HTML_SRC = """
 <!doctype html>
 <html>
 <head>
@@ -35,15 +36,34 @@ HTML_TMPL = Template("""
   </div>
 </body>
 </html>
-""")
+"""
 
-def render_html(items):
-    date_str = datetime.utcnow().strftime("%A, %B %d, %Y")
-    return HTML_TMPL.render(items=items, date_str=date_str)
+# Next to the other run caches so CI can persist it with them
+CACHE_DIR = os.environ.get("JINJA_CACHE_DIR", "data/jinja_cache")
 
-def render_text(items):
-    lines = [f"Morning Brief — {datetime.utcnow().strftime('%A, %B %d, %Y')}", ""]
-    for it in items:
-        lines.append(f"- {it['summary']} ({it['source']})")
-        lines.append(f"  {it['url']}")
+@functools.lru_cache(maxsize=1)
+def _template() -> Template:
+    """Compiled once per process, on first render; bytecode cache skips re-parsing across runs."""
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        bcc = FileSystemBytecodeCache(CACHE_DIR)
+    except OSError:
+        bcc = None  # unwritable: just compile in memory
+    env = Environment(
+        loader=DictLoader({"brief": HTML_SRC}),
+        autoescape=True,
+        auto_reload=False,
+        bytecode_cache=bcc,
+    )
+    return env.get_template("brief")
+
+def _today_str() -> str:
+    return datetime.utcnow().strftime("%A, %B %d, %Y")
+
+def render_html(items, date_str: str | None = None):
+    return _template().render(items=items, date_str=date_str or _today_str())
+
+def render_text(items, date_str: str | None = None):
+    lines = [f"Morning Brief — {date_str or _today_str()}", ""]
+    lines += [f"- {it['summary']} ({it['source']})\n  {it['url']}" for it in items]
     return "\n".join(lines)
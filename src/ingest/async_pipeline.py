@@ -0,0 +1,101 @@
+import asyncio, aiohttp
+from typing import List, Dict, Mapping, NamedTuple, Tuple
+
+from src.ingest.html_list import DEFAULT_HEADERS, parse_html_list
+from src.ingest.rss import RSS_ACCEPT, parse_rss
+from src.util.validators import conditional_headers, remember
+
+_TIMEOUT = aiohttp.ClientTimeout(total=12)
+
+# Same policy as src.util.http.new_session: 2 retries, 0.3s exponential backoff
+_RETRY_STATUSES = frozenset({502, 503, 504})
+_RETRIES = 2
+_BACKOFF = 0.3
+
+# (url, ETag, Last-Modified) as served, applied once all feeds are in
+Validators = Tuple[str, str | None, str | None]
+
+class _Response(NamedTuple):
+    status: int
+    headers: Mapping[str, str]
+    body: bytes
+    charset: str | None
+    url: str
+
+async def _read(resp: aiohttp.ClientResponse, passthrough: Tuple[int, ...]) -> _Response:
+    if resp.status not in passthrough:
+        resp.raise_for_status()
+    return _Response(resp.status, resp.headers, await resp.read(), resp.charset, str(resp.url))
+
+async def _get(session: aiohttp.ClientSession, url: str, headers: Dict[str, str] | None = None,
+               passthrough: Tuple[int, ...] = ()) -> _Response:
+    """GET url and read the body, retrying gateway errors and dropped connections.
+       Error statuses raise ClientResponseError unless listed in passthrough.
+    """
+    for attempt in range(_RETRIES):
+        try:
+            async with session.get(url, headers=headers) as resp:
+                if resp.status not in _RETRY_STATUSES:
+                    return await _read(resp, passthrough)
+        except aiohttp.ClientConnectionError:
+            pass
+        await asyncio.sleep(_BACKOFF * 2 ** attempt)
+    async with session.get(url, headers=headers) as resp:  # last try: errors propagate
+        return await _read(resp, passthrough)
+
+async def _fetch_rss(session: aiohttp.ClientSession, url: str, limit: int,
+                     scope: str | None) -> Tuple[List[Dict], Validators | None]:
+    headers = {"Accept": RSS_ACCEPT}
+    if scope is not None:
+        headers.update(conditional_headers(url, scope))
+    r = await _get(session, url, headers)
+    if r.status == 304:  # unchanged since last run: nothing new to parse
+        return [], None
+
+    # feedparser is CPU-bound; keep it off the event loop
+    out = await asyncio.to_thread(parse_rss, r.body, limit, r.headers.get("Content-Type", ""), r.url)
+    return out, (url, r.headers.get("ETag"), r.headers.get("Last-Modified"))
+
+async def _fetch_html_list(session: aiohttp.ClientSession, url: str, limit: int,
+                           scope: str | None) -> Tuple[List[Dict], Validators | None]:
+    """Best-effort list-page fetcher. Prefer RSS when available.
+       Returns no items on 403/429/network errors so the pipeline continues.
+    """
+    try:
+        r = await _get(session, url, passthrough=(403, 429))
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        return [], None
+    if r.status in (403, 429):
+        return [], None
+    # regex scan over the whole page: off the loop like feedparser, so one big page
+    # can't stall the other fetches while their timeouts run
+    out = await asyncio.to_thread(parse_html_list, r.body, url, limit, r.charset or "utf-8")
+    return out, None
+
+async def collect_items_async(feeds: List[Dict], per_source: int, debug: bool = False,
+                              scope: str | None = None) -> List[Dict]:
+    """Fetch every feed concurrently over one pooled session; results keep feed order.
+       scope: ingest-settings tag for conditional GETs; None fetches every feed in full.
+    """
+    connector = aiohttp.TCPConnector(limit=32, ttl_dns_cache=300, keepalive_timeout=60)
+    async with aiohttp.ClientSession(connector=connector, headers=DEFAULT_HEADERS, timeout=_TIMEOUT) as session:
+        tasks = []
+        for f in feeds:
+            fn = _fetch_rss if f.get("type", "rss") == "rss" else _fetch_html_list
+            tasks.append(fn(session, f["url"], per_source, scope))
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    items: List[Dict] = []
+    for f, res in zip(feeds, results):
+        name = f["name"]
+        if isinstance(res, BaseException):
+            if debug:
+                print(f"[ingest] skipped {name} ({f['url']}) due to: {res}")
+            continue
+        got, validators = res
+        if validators is not None:
+            remember(*validators)  # staged only; main commits them after dedupe
+        for g in got:
+            g["source"] = name
+        items.extend(got)
+    return items
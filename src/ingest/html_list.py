@@ -1,8 +1,7 @@
-import re, requests
+import regex
 from typing import List, Dict
 from html import unescape
 from urllib.parse import urljoin
-from requests.exceptions import RequestException
 
 DEFAULT_HEADERS = {
     # A normal desktop browser UA helps with basic bot filters
@@ -13,46 +12,34 @@ DEFAULT_HEADERS = {
     ),
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
     "Accept-Language": "en-US,en;q=0.9",
-    "Connection": "close",
 }
 
-def fetch_html_list(url: str, limit: int = 10, headers: Dict[str, str] | None = None) -> List[Dict]:
-    """Best-effort list-page fetcher. Prefer RSS when available.
-       Returns [] on 403/429/Network errors so the pipeline continues.
-    """
-    try:
-        r = requests.get(
-            url, timeout=12,
-            headers={**DEFAULT_HEADERS, **(headers or {})},
-            allow_redirects=True,
-        )
-        # Treat hard blocks as "no items" instead of raising
-        if r.status_code in (403, 429):
-            return []
-        r.raise_for_status()
-    except RequestException:
-        return []
+# Compiled once; scans the raw bytes so only matched anchors get decoded.
+# Attributes are consumed up to the first whitespace-led href=" (so data-href=
+# and the like are skipped). Every span stops at the next '<' or '>', so an
+# unclosed <a can't run on to the end of the page: with the possessive/atomic
+# spans (via `regex`) each attempt is bounded by its own tag, keeping the scan
+# linear on malformed markup.
+_HREF_RE = regex.compile(
+    rb'<a(?=\s)(?:[^<>\s]++|\s(?!href="))*+\shref="([^"<]++)"[^<>]*+>([^<]{20,140})</a>', regex.I
+)
 
-    page = r.text
+def parse_html_list(page: bytes, url: str, limit: int = 10, enc: str = "utf-8") -> List[Dict]:
+    """Extract headline links from a fetched list page (raw bytes)."""
+    candidates = _HREF_RE.findall(page)
 
-    # NOTE: Correct regex (only one backslash before 's').
-    # If your previous file had r'<a\\s...>', replace it with r'<a\s...>'
-    candidates = re.findall(
-        r'<a\s[^>]*href="([^"]+)"[^>]*>([^<]{20,140})</a>', page, flags=re.I
-    )
-
-    seen = set()
+    seen: set[str] = set()  # by href: the same link with different anchor text is one story
     out: List[Dict] = []
-    for href, text in candidates:
-        text = unescape(text).strip()
+    for href_b, text_b in candidates:
+        href = href_b.decode(enc, errors="replace")
+        text = unescape(text_b.decode(enc, errors="replace")).strip()
         if not text or len(text.split()) < 3:
             continue
         if href.startswith("/"):
             href = urljoin(url, href)
-        key = (href, text)
-        if key in seen:
+        if href in seen:
             continue
-        seen.add(key)
+        seen.add(href)
         out.append({"title": text, "url": href, "dek": ""})
         if len(out) >= limit:
             break
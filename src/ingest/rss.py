@@ -1,9 +1,14 @@
 import feedparser, html
 from typing import List, Dict
 
-# Fetch and parse RSS feed, return list of items with title, url, dek (brief summary)
-def fetch_rss(url: str, limit: int = 10) -> List[Dict]:
-    feed = feedparser.parse(url)
+RSS_ACCEPT = "application/rss+xml,application/atom+xml,application/xml;q=0.9,*/*;q=0.8"
+
+def parse_rss(content: bytes, limit: int = 10, content_type: str = "", location: str = "") -> List[Dict]:
+    """Parse an already-fetched feed body into title/url/dek items."""
+    feed = feedparser.parse(content, response_headers={
+        "content-type": content_type,
+        "content-location": location,
+    })
     out = []
     for e in feed.entries[:limit]:
         title = html.unescape(getattr(e, "title", "") or "")
@@ -1,12 +1,14 @@
-import os, yaml, time, argparse
+import os, re, yaml, argparse, functools, atexit, weakref, asyncio
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
 from typing import List, Dict
 from datetime import datetime
 from dotenv import load_dotenv
 
-from src.ingest.rss import fetch_rss
-from src.ingest.html_list import fetch_html_list
+from src.ingest.async_pipeline import collect_items_async
 from src.summarize.sonar import SonarSummarizer
 from src.util.cache import filter_new, mark_seen
+from src.util.validators import commit as commit_validators
 from src.format.html import render_html, render_text
 from src.senders.discord import send_discord
 # from src.senders.whatsapp_cloud import send_whatsapp_brief  # enable later
@@ -20,12 +22,18 @@ def _parse_keywords(s: str | None) -> List[str]:
     raw = [x.strip().lower() for x in s.replace(";", ",").split(",")]
     return [x for x in raw if x]
 
-def _should_keep(item: Dict, includes: List[str], excludes: List[str]) -> bool:
-    text = f"{item.get('title','')} {item.get('dek','')}".lower()
-    if excludes and any(x in text for x in excludes):
+def _compile_terms(terms: List[str]) -> re.Pattern | None:
+    """One alternation regex so each item's text is scanned once, in C."""
+    if not terms:
+        return None
+    return re.compile("|".join(map(re.escape, terms)))
+
+def _should_keep(item: Dict, inc_re: re.Pattern | None, exc_re: re.Pattern | None) -> bool:
+    text = item["_needle"]
+    if exc_re and exc_re.search(text):
         return False
-    if includes:
-        return any(x in text for x in includes)
+    if inc_re:
+        return bool(inc_re.search(text))
     return True
 
 def _apply_keyword_filter(items: List[Dict], include_s: str | None, exclude_s: str | None) -> List[Dict]:
@@ -38,54 +46,81 @@ def _apply_keyword_filter(items: List[Dict], include_s: str | None, exclude_s: s
     if not excludes and exclude_s is None:
         excludes = _parse_keywords("opinion")
 
-    return [it for it in items if _should_keep(it, includes, excludes)]
+    inc_re = _compile_terms(includes)
+    exc_re = _compile_terms(excludes)
+    # Lowercase each item once; include and exclude scans share the buffer
+    for it in items:
+        it["_needle"] = f"{it.get('title','')} {it.get('dek','')}".lower()
+    return [it for it in items if _should_keep(it, inc_re, exc_re)]
 
 
 # --------------------------------- logging ------------------------------------
 
-def _now_local():
+@functools.lru_cache(maxsize=1)
+def _local_tz():
+    # Resolved lazily (not at import) so a TZ set via .env/load_dotenv still applies
     tz_name = os.getenv("TZ")
     if tz_name:
         try:
             from zoneinfo import ZoneInfo
-            return datetime.now(ZoneInfo(tz_name))
+            return ZoneInfo(tz_name)
+        except Exception:
+            pass
+    return None
+
+def _now_local():
+    return datetime.now(_local_tz())
+
+# Open log handles, tracked weakly so ones evicted from the LRU still close normally
+_LOG_FPS = weakref.WeakSet()
+
+@functools.lru_cache(maxsize=4)
+def _get_log_fp(path: str):
+    """Append-mode handle kept open (and buffered) across writes to the same day's log."""
+    fp = open(path, "a", encoding="utf-8", buffering=1 << 16)
+    _LOG_FPS.add(fp)
+    return fp
+
+@atexit.register
+def _close_log_fps() -> None:
+    for fp in list(_LOG_FPS):
+        try:
+            fp.close()  # flushes the buffer
         except Exception:
             pass
-    return datetime.now()
 
 def _log_brief(plaintext: str, outdir: str = "data") -> str:
     os.makedirs(outdir, exist_ok=True)
-    stamp = _now_local().strftime("%Y%m%d_%H%M%S")
-    day = _now_local().strftime("%Y%m%d")
+    now = _now_local()
+    stamp = now.strftime("%Y%m%d_%H%M%S")
+    day = now.strftime("%Y%m%d")
     path = os.path.join(outdir, f"brief-{day}.txt")
-    with open(path, "a", encoding="utf-8") as f:
-        f.write(f"\n=== Run {stamp} ===\n")
-        f.write(plaintext.strip() + "\n")
+    f = _get_log_fp(path)
+    f.write(f"\n=== Run {stamp} ===\n")
+    f.write(plaintext.strip() + "\n")
     return path
 
 
 # --------------------------------- ingest -------------------------------------
 
+# libyaml's C loader when PyYAML was built with it; same safe semantics either way
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 def load_feeds(path: str = "feeds.yml") -> List[Dict]:
     with open(path, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
-
-def collect_items(feeds: List[Dict], per_source: int, debug: bool = False) -> List[Dict]:
-    items: List[Dict] = []
-    for f in feeds:
-        t = f.get("type", "rss")
-        url = f["url"]
-        name = f["name"]
-        try:
-            got = fetch_rss(url, per_source) if t == "rss" else fetch_html_list(url, per_source)
-            for g in got:
-                g["source"] = name
-                items.append(g)
-        except Exception as e:
-            if debug:
-                print(f"[ingest] skipped {name} ({url}) due to: {e}")
-            continue
-    return items
+        return yaml.load(f, Loader=_YAML_LOADER)
+
+def collect_items(feeds: List[Dict], per_source: int, debug: bool = False,
+                  scope: str | None = None) -> List[Dict]:
+    if not feeds:
+        return []
+    # Feeds are network-bound: fetch them all concurrently on one event loop
+    return asyncio.run(collect_items_async(feeds, per_source, debug=debug, scope=scope))
+
+def _ingest_scope(cfg: "Config") -> str:
+    """Settings that decide which feed entries reach the seen cache. A feed's 304 is
+    only trusted when the run that stored its validators used the same ones."""
+    return repr((cfg.per_source, cfg.no_filter, cfg.include_s, cfg.exclude_s))
 
 def _limit_total(items: List[Dict], max_total: int | None) -> List[Dict]:
     if not max_total or max_total <= 0:
@@ -108,43 +143,70 @@ def _parse_args():
     return p.parse_args()
 
 
+@dataclass(frozen=True)
+class Config:
+    """Run settings resolved once from CLI args + env (CLI wins)."""
+    debug: bool
+    run_tag: str
+    per_source: int
+    max_total: int | None
+    include_s: str | None
+    exclude_s: str | None
+    no_filter: bool
+    ignore_cache: bool
+    dry_run: bool
+    summ_batch_size: int
+    summ_concurrency: int
+
+def _load_config(args) -> Config:
+    # Identify run source (helps in Discord + logs)
+    event = os.getenv("GITHUB_EVENT_NAME", "")
+    run_tag = "AUTO (schedule)" if event == "schedule" else ("MANUAL (dispatch)" if event == "workflow_dispatch" else "LOCAL")
+    return Config(
+        debug=args.debug or bool(os.getenv("DEBUG")),
+        run_tag=run_tag,
+        per_source=args.max_per_source or int(os.getenv("MAX_ITEMS_PER_SOURCE", "5")),
+        max_total=args.max_total,
+        include_s=args.include if args.include is not None else os.getenv("INCLUDE_KEYWORDS"),
+        exclude_s=args.exclude if args.exclude is not None else os.getenv("EXCLUDE_KEYWORDS"),
+        no_filter=args.no_filter,
+        ignore_cache=args.ignore_cache,
+        dry_run=args.dry_run,
+        summ_batch_size=max(1, int(os.getenv("SUMM_BATCH_SIZE", "8"))),
+        summ_concurrency=max(1, int(os.getenv("SUMM_CONCURRENCY", "6"))),
+    )
+
+
 # ----------------------------------- main -------------------------------------
 
 def main():
     load_dotenv()
-    args = _parse_args()
-    debug = args.debug or bool(os.getenv("DEBUG"))
-
-    # Defaults from env, CLI overrides if provided
-    per_source = args.max_per_source or int(os.getenv("MAX_ITEMS_PER_SOURCE", "5"))
-    include_env = os.getenv("INCLUDE_KEYWORDS")
-    exclude_env = os.getenv("EXCLUDE_KEYWORDS")
-
-    # Identify run source (helps in Discord + logs)
-    event = os.getenv("GITHUB_EVENT_NAME", "")
-    run_tag = "AUTO (schedule)" if event == "schedule" else ("MANUAL (dispatch)" if event == "workflow_dispatch" else "LOCAL")
+    cfg = _load_config(_parse_args())
+    debug = cfg.debug
+    run_tag = cfg.run_tag
 
     # 1) ingest
     feeds = load_feeds()
     if debug:
-        print(f"[config] run_tag={run_tag} per_source={per_source}")
+        print(f"[config] run_tag={run_tag} per_source={cfg.per_source}")
         print(f"[config] feeds= {[f['name'] for f in feeds]}")
 
-    raw = collect_items(feeds, per_source, debug=debug)
+    # Conditional GETs only when this run dedupes; the scope ties stored validators to
+    # the settings that decided which entries were kept (see _ingest_scope)
+    scope = None if cfg.ignore_cache else _ingest_scope(cfg)
+    raw = collect_items(feeds, cfg.per_source, debug=debug, scope=scope)
     if debug:
         print(f"[counts] ingested={len(raw)}")
 
     # 2) keyword filter
-    if args.no_filter:
+    if cfg.no_filter:
         filtered = raw
         if debug:
             print("[filter] disabled via --no-filter")
     else:
-        include_s = args.include if args.include is not None else include_env
-        exclude_s = args.exclude if args.exclude is not None else exclude_env
         if debug:
-            print(f"[filter] include={include_s} exclude={exclude_s}")
-        filtered = _apply_keyword_filter(raw, include_s, exclude_s)
+            print(f"[filter] include={cfg.include_s} exclude={cfg.exclude_s}")
+        filtered = _apply_keyword_filter(raw, cfg.include_s, cfg.exclude_s)
 
     if debug:
         print(f"[counts] after_filter={len(filtered)}")
@@ -152,22 +214,25 @@ def main():
             print(f"  • {it.get('title','')[:90]}  [{it.get('source','')}]")
 
     # 3) dedupe or bypass
-    if args.ignore_cache:
+    if cfg.ignore_cache:
         fresh = filtered
         if debug:
             print("[dedupe] bypassed via --ignore-cache")
     else:
         fresh = filter_new(filtered)
+        # every ingested entry is now either seen or filtered out by this scope's
+        # keywords, so a 304 next run can't hide anything this run would have sent
+        commit_validators(scope)
         if debug:
             print(f"[dedupe] kept={len(fresh)} (cache applied)")
 
     # 4) optional cap on total items (before summarization to save tokens)
-    capped = _limit_total(fresh, args.max_total)
+    capped = _limit_total(fresh, cfg.max_total)
     if debug:
-        print(f"[counts] after_cap={len(capped)} (max_total={args.max_total})")
+        print(f"[counts] after_cap={len(capped)} (max_total={cfg.max_total})")
 
     # even if we bypassed de-dupe, record these as seen so subsequent runs don’t repeat
-    if args.ignore_cache and capped:
+    if cfg.ignore_cache and capped:
         try:
             mark_seen(capped)
             if debug:
@@ -182,33 +247,45 @@ def main():
         if debug:
             print(msg)
         # Don’t send an empty brief to Discord; comment the next line if you DO want a heartbeat
-        # if not args.dry_run: send_discord(msg)
+        # if not cfg.dry_run: send_discord(msg)
         return
 
-    # 5) summarize
+    # 5) summarize: one API call per batch, batches in flight concurrently
     summarizer = SonarSummarizer()
-    summarized: List[Dict] = []
-    for idx, it in enumerate(capped, 1):
-        if debug:
-            print(f"[summ] {idx}/{len(capped)}: {it.get('title','')[:100]}  [{it.get('source','')}]")
-        summary = summarizer.summarize_one(
-            it.get("title", ""), it.get("dek", ""), it.get("source", "")
-        )
-        summarized.append({
+    try:
+        batch_size = cfg.summ_batch_size
+        batches = [capped[i:i + batch_size] for i in range(0, len(capped), batch_size)]
+        with ThreadPoolExecutor(max_workers=cfg.summ_concurrency) as ex:
+            futures = {}
+            for b_idx, batch in enumerate(batches):
+                if debug:
+                    print(f"[summ] batch {b_idx + 1}/{len(batches)}: {len(batch)} items")
+                futures[ex.submit(summarizer.summarize_many, batch)] = b_idx
+            by_batch: Dict[int, List[str]] = {}
+            for fut in as_completed(futures):
+                by_batch[futures[fut]] = fut.result()
+        summaries: List[str] = [s for b_idx in range(len(batches)) for s in by_batch[b_idx]]
+    finally:
+        summarizer.close()
+
+    summarized: List[Dict] = [
+        {
             "title": it.get("title", ""),
             "url": it["url"],
             "source": it["source"],
             "summary": summary,
-        })
-        time.sleep(0.2)
-
-    # 6) render
-    html_body = render_html(summarized)
-    text_body = render_text(summarized)
+        }
+        for it, summary in zip(capped, summaries)
+    ]
+
+    # 6) render (one timestamp shared by both formats)
+    date_str = datetime.utcnow().strftime("%A, %B %d, %Y")
+    html_body = render_html(summarized, date_str)
+    text_body = render_text(summarized, date_str)
     text_body = f"[{run_tag}]\n" + text_body  # tag the run type for quick visibility
 
     # 7) deliver (unless dry-run)
-    if not args.dry_run:
+    if not cfg.dry_run:
         if debug:
             print(f"[send] discord chars={len(text_body)}")
         send_discord(text_body)
@@ -1,14 +1,28 @@
-import os, requests, logging
+import os, logging
+import orjson
+
+from src.util.http import new_session
+
+_SESSION = new_session()
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+def _truncate_utf8(s: str, max_bytes: int) -> str:
+    """Cut to at most max_bytes of UTF-8 without splitting a multi-byte character."""
+    b = s.encode("utf-8")
+    if len(b) <= max_bytes:
+        return s
+    return b[:max_bytes].decode("utf-8", errors="ignore")
 
 # Send a brief text message to a Discord channel via webhook
 def send_discord(content: str) -> None:
     url = os.getenv("DISCORD_WEBHOOK_URL", "")
     if not url:
         return
-    # Discord hard limit ~2000 chars; we keep it under that
-    data = {"content": content[:1800]}
+    # Discord hard limit is 2000; measure in bytes so multi-byte text stays under it
+    data = {"content": _truncate_utf8(content, 1900)}
     try:
-        requests.post(url, json=data, timeout=10)
+        _SESSION.post(url, data=orjson.dumps(data), headers=_JSON_HEADERS, timeout=10)
     except Exception:
         # best-effort channel
         pass
@@ -2,7 +2,8 @@
 # ---------------------------------------------------------------------
 # Single-pass Perplexity Sonar summarizer tuned for "executive brief"
 # one-liners. Keeps output to ONE crisp sentence, normalizes dates/
-# units, and includes a few safe-guards. Fast & cheap: one API call.
+# units, and includes a few safe-guards. Fast & cheap: one API call
+# per item, or one per batch via summarize_many().
 #
 # ENV knobs (optional):
 #   PPLX_API_KEY       : Perplexity API key (required)
@@ -22,21 +23,48 @@
 import os
 import re
 from datetime import datetime
+
+import httpx
 from openai import OpenAI
 
+from src.util import summary_cache
+
 # ==== Prompt =================================================================
 
-SYSTEM_PROMPT = (
-    "Executive finance brief. Return exactly ONE sentence (<=28 words), no line breaks. "
+_STYLE_RULES = (
     "Lead with the actor or ticker. State the concrete action or outcome. "
     "If numbers or dates appear, include ONE most material figure ($, %, units) or a specific date. "
     "Format dates as 'Sep 6, 2025' (month short name). "
     "Prefer specifics over adjectives; use active voice; avoid hedging (no may/might/could), hype, quotes, emojis, and lists. "
-    'Use standard abbreviations (e.g., "U.S.", "UK", "EU"). End with a period and return only the sentence.'
+    'Use standard abbreviations (e.g., "U.S.", "UK", "EU"). '
+)
+
+SYSTEM_PROMPT = (
+    "Executive finance brief. Return exactly ONE sentence (<=28 words), no line breaks. "
+    + _STYLE_RULES
+    + "End with a period and return only the sentence."
+)
+
+# Batch variant: N numbered items in, N numbered one-sentence lines out
+BATCH_SYSTEM_PROMPT = (
+    "Executive finance brief. For EACH numbered item, write exactly ONE sentence (<=28 words). "
+    + _STYLE_RULES
+    + "End each sentence with a period. Return one line per item, prefixed with the item's number "
+    "in brackets (e.g., '[1] ...'), and nothing else."
 )
 
+_NUMBERED_LINE_RE = re.compile(r"^\s*\[(\d+)\]\s*(.+?)\s*$", re.M)
+
 # ==== Helpers ================================================================
 
+# Precompiled post-processing patterns (used once per summary)
+_ISO_DATE_RE = re.compile(r"\b(\d{4})-(\d{1,2})-(\d{1,2})\b")
+_PCT_RE = re.compile(r"(?<=\d)\s*percent\b", re.I)
+_BPD_RE = re.compile(r"\bbarrels per day\b", re.I)
+_MPS_RE = re.compile(r"(\d)\s*MPs\b")
+_PUNCT_RE = re.compile(r"\s+([,.:;!?])")
+_WS_RE = re.compile(r"\s{2,}")
+
 def _format_iso_dates(text: str) -> str:
     """Convert ISO-like dates (YYYY-MM-DD) to 'Mon D, YYYY' (cross-platform)."""
     def repl(m):
@@ -50,25 +78,25 @@ def _format_iso_dates(text: str) -> str:
             return m.group(0)
 
     # match 2025-09-06 or 2025-9-6 (be flexible on month/day 1-2 digits)
-    return re.sub(r"\b(\d{4})-(\d{1,2})-(\d{1,2})\b", repl, text)
+    return _ISO_DATE_RE.sub(repl, text)
 
 
 def _tidy_units(text: str) -> str:
     """Normalize common units and punctuation spacing."""
     # "99.1 percent" -> "99.1%"  (number + optional space + 'percent')
-    text = re.sub(r"(?<=\d)\s*percent\b", "%", text, flags=re.I)
+    text = _PCT_RE.sub("%", text)
 
     # barrels per day -> b/d
-    text = re.sub(r"\bbarrels per day\b", "b/d", text, flags=re.I)
+    text = _BPD_RE.sub("b/d", text)
 
     # add space in things like "5MPs" -> "5 MPs"
-    text = re.sub(r"(\d)\s*MPs\b", r"\1 MPs", text)
+    text = _MPS_RE.sub(r"\1 MPs", text)
 
     # collapse spaces before punctuation  ("word , word" -> "word, word")
-    text = re.sub(r"\s+([,.:;!?])", r"\1", text)
+    text = _PUNCT_RE.sub(r"\1", text)
 
     # normalize multi-spaces
-    text = re.sub(r"\s{2,}", " ", text)
+    text = _WS_RE.sub(" ", text)
 
     return text
 
@@ -119,12 +147,31 @@ class SonarSummarizer:
         self.max_tokens = int(os.getenv("BRIEF_MAX_TOKENS", "60"))
         self.word_cap = int(os.getenv("BRIEF_WORD_CAP", "28"))
 
+        # One long-lived HTTP/2 client so concurrent summaries share a connection
+        self._http = httpx.Client(
+            http2=True,
+            timeout=httpx.Timeout(30.0),
+            limits=httpx.Limits(max_keepalive_connections=16, max_connections=32),
+        )
+
         # Perplexity Sonar via OpenAI client (custom base_url)
-        self.client = OpenAI(api_key=api_key, base_url="https://api.perplexity.ai")
+        self.client = OpenAI(api_key=api_key, base_url="https://api.perplexity.ai", http_client=self._http)
         self.model = model
 
-    def summarize_one(self, title: str, dek: str, source: str) -> str:
-        """Return one tight, normalized sentence summarizing title+dek."""
+    def close(self) -> None:
+        """Release pooled connections held by the HTTP client."""
+        self._http.close()
+
+    def _finalize(self, content: str, title: str) -> str:
+        """Sanitize model output; fall back to the cleaned title if it looks like junk."""
+        content = _sanitize_one_sentence((content or "").strip(), max_words=self.word_cap)
+        if not _looks_like_sentence(content):
+            return _sanitize_one_sentence((title or "").strip(), max_words=self.word_cap)
+        return content
+
+    @summary_cache.cached
+    def _summarize_one_api(self, title: str, dek: str, source: str) -> str:
+        """One API call for one item; raises on transport/API errors (nothing gets cached)."""
         text = (title or "").strip()
         if dek:
             text += "\n\n" + dek.strip()
@@ -141,23 +188,76 @@ class SonarSummarizer:
             },
         ]
 
-        try:
-            out = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                max_tokens=self.max_tokens,   # encourages punchy output
-                temperature=0,                # deterministic
-            )
-            content = (out.choices[0].message.content or "").strip()
-            content = _sanitize_one_sentence(content, max_words=self.word_cap)
-
-            # Fallback if the model produced junk
-            if not _looks_like_sentence(content):
-                fallback = _sanitize_one_sentence((title or "").strip(), max_words=self.word_cap)
-                return fallback
-
-            return content
+        out = self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            max_tokens=self.max_tokens,   # encourages punchy output
+            temperature=0,                # deterministic
+        )
+        return self._finalize(out.choices[0].message.content or "", title)
 
+    def summarize_one(self, title: str, dek: str, source: str) -> str:
+        """Return one tight, normalized sentence summarizing title+dek."""
+        try:
+            return self._summarize_one_api(title, dek, source)
         except Exception:
             # Last resort: cleaned title so the pipeline always ships
             return _sanitize_one_sentence((title or "").strip(), max_words=self.word_cap)
+
+    def summarize_many(self, items: list[dict]) -> list[str]:
+        """Summarize several items in ONE API call; returns sentences in input order.
+           Cached items skip the network; any item the model skips (or a failed call)
+           falls back to summarize_one.
+        """
+        if not items:
+            return []
+
+        keys = [summary_cache.summary_key(it.get("title", ""), it.get("dek", ""), it.get("source", "")) for it in items]
+        cached = summary_cache.get_many(keys)
+        misses = [idx for idx, k in enumerate(keys) if k not in cached]
+
+        got: dict[int, str] = {}
+        if len(misses) > 1:
+            blocks = []
+            for n, idx in enumerate(misses, 1):
+                it = items[idx]
+                blocks.append(
+                    f"[{n}] Source={it.get('source', '')}\n"
+                    f"Title={(it.get('title') or '').strip()}\n"
+                    f"Dek={(it.get('dek') or '').strip()}"
+                )
+            messages = [
+                {"role": "system", "content": BATCH_SYSTEM_PROMPT},
+                {
+                    "role": "user",
+                    "content": (
+                        "\n---\n".join(blocks)
+                        + f"\n\nReturn exactly {len(misses)} lines, one per item:"
+                    ),
+                },
+            ]
+            try:
+                out = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    max_tokens=self.max_tokens * len(misses),
+                    temperature=0,
+                )
+                for m in _NUMBERED_LINE_RE.finditer(out.choices[0].message.content or ""):
+                    n = int(m.group(1)) - 1
+                    if 0 <= n < len(misses) and misses[n] not in got:
+                        idx = misses[n]
+                        got[idx] = self._finalize(m.group(2), items[idx].get("title", ""))
+            except Exception:
+                pass
+            summary_cache.put_many([(keys[idx], s) for idx, s in got.items()])
+
+        results = []
+        for idx, it in enumerate(items):
+            if keys[idx] in cached:
+                results.append(cached[keys[idx]])
+            elif idx in got:
+                results.append(got[idx])
+            else:
+                results.append(self.summarize_one(it.get("title", ""), it.get("dek", ""), it.get("source", "")))
+        return results
@@ -1,73 +1,224 @@
-import json, time, hashlib, os
-from typing import List, Dict
-from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+import sqlite3, time, hashlib, os, re, functools, atexit
+from contextlib import contextmanager
+from typing import Iterator, List, Set
+from urllib.parse import urlsplit, urlunsplit
+
+try:
+    import xxhash
+except ImportError:  # optional accelerator; BLAKE2b-128 keeps the same key width
+    xxhash = None
 
 # Configuration via environment variables
-CACHE_PATH = os.environ.get("SEEN_CACHE_PATH", "data/seen.json")
+# v2: 128-bit keys (v1 used SHA-256, which can't be rehashed without the URLs)
+CACHE_PATH = os.environ.get("SEEN_CACHE_PATH", "data/seen.v2.json")
 TTL_SECONDS = int(os.environ.get("SEEN_TTL_SECONDS", str(72*3600)))  # default 72h
+MAX_ENTRIES = int(os.environ.get("SEEN_MAX_ENTRIES", "200000"))  # 0 disables the cap
+
+# Seen keys live in SQLite next to where the JSON file used to be
+DB_PATH = CACHE_PATH.replace(".json", ".sqlite")
+
+# Which hash produced the stored keys; recorded in the DB so a switch never mixes namespaces
+KEY_HASH = "xxh3_128" if xxhash is not None else "blake2b128"
+
+# Past this size, let SQLite read pages straight from the page cache via mmap
+_MMAP_THRESHOLD = 1 << 20
+_MMAP_SIZE = 256 << 20
+
+# 1: hex TEXT keys; 2: raw 16-byte BLOB keys (a quarter of the hex size)
+CACHE_SCHEMA_VERSION = 2
 
 def _now() -> int:
     return int(time.time())
 
-def _load() -> Dict[str, int]:
-    if not os.path.exists(CACHE_PATH):
-        os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
-        return {}
+def _create_seen(conn: sqlite3.Connection) -> None:
+    conn.execute("CREATE TABLE IF NOT EXISTS seen (key BLOB PRIMARY KEY, ts INTEGER NOT NULL) WITHOUT ROWID")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_seen_ts ON seen(ts)")  # TTL purge touches only expired rows
+
+def _migrate(conn: sqlite3.Connection) -> None:
+    """Rewrite a schema-1 table (hex TEXT keys) as raw BLOB keys, keeping timestamps."""
+    conn.execute("BEGIN IMMEDIATE")
+    rows = []
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'seen'").fetchone():
+        for key, ts in conn.execute("SELECT key, ts FROM seen"):
+            try:
+                rows.append((bytes.fromhex(key) if isinstance(key, str) else key, ts))
+            except ValueError:
+                continue
+        conn.execute("DROP TABLE seen")
+    _create_seen(conn)
+    conn.executemany("INSERT OR REPLACE INTO seen(key, ts) VALUES (?, ?)", rows)
+    conn.execute("INSERT OR REPLACE INTO meta(name, value) VALUES ('schema_version', ?)",
+                 (str(CACHE_SCHEMA_VERSION),))
+    conn.execute("COMMIT")
+
+_CONN: sqlite3.Connection | None = None
+
+def _conn() -> sqlite3.Connection:
+    """Process-wide connection; schema checks and migrations run on first use only."""
+    global _CONN
+    if _CONN is not None:
+        return _CONN
+    d = os.path.dirname(DB_PATH)
+    if d:
+        os.makedirs(d, exist_ok=True)
+    conn = sqlite3.connect(DB_PATH, isolation_level=None)  # explicit BEGIN/COMMIT in _write_txn
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")  # WAL keeps this crash-safe; skips an fsync per commit
+    if os.path.getsize(DB_PATH) > _MMAP_THRESHOLD:
+        conn.execute(f"PRAGMA mmap_size={_MMAP_SIZE}")
+    conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+    meta = dict(conn.execute("SELECT name, value FROM meta"))
+    recount = "row_count" not in meta
+    if int(meta.get("schema_version", 1)) < CACHE_SCHEMA_VERSION:
+        _migrate(conn)
+        recount = True
+    _create_seen(conn)
+    if meta.get("key_hash", "blake2b128") != KEY_HASH:
+        # Keys from another hash can never match; start the seen set over
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DELETE FROM seen")
+        conn.execute("INSERT OR REPLACE INTO meta(name, value) VALUES ('key_hash', ?)", (KEY_HASH,))
+        conn.execute("COMMIT")
+        recount = True
+    if recount:
+        # one full count for DBs that predate the counter; writers keep it current after that
+        conn.execute("BEGIN IMMEDIATE")
+        _set_row_count(conn, conn.execute("SELECT COUNT(*) FROM seen").fetchone()[0])
+        conn.execute("COMMIT")
+    _CONN = conn
+    return conn
+
+def _compact(conn: sqlite3.Connection) -> None:
+    """VACUUM once purged (free) pages outnumber live ones, so the file tracks the live set."""
+    free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    total = conn.execute("PRAGMA page_count").fetchone()[0]
+    if free * 2 > total:
+        conn.execute("VACUUM")
+
+@atexit.register
+def _close() -> None:
+    """Closing the last connection checkpoints the WAL back into the main DB file."""
+    global _CONN
+    if _CONN is not None:
+        try:
+            _compact(_CONN)
+        except sqlite3.Error:
+            pass
+        _CONN.close()
+        _CONN = None
+
+@contextmanager
+def _write_txn() -> Iterator[sqlite3.Connection]:
+    """Run the body in one IMMEDIATE transaction on the shared connection."""
+    conn = _conn()
+    conn.execute("BEGIN IMMEDIATE")
     try:
-        with open(CACHE_PATH, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        return {}
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+_MAX_VARS = 900  # stay under SQLite's default 999 bound-parameter limit
 
-def _save(d: Dict[str, int]) -> None:
-    os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
-    with open(CACHE_PATH, "w", encoding="utf-8") as f:
-        json.dump(d, f)
+def _existing(conn: sqlite3.Connection, keys: List[bytes]) -> Set[bytes]:
+    """Subset of keys already in the table, via chunked primary-key IN lookups.
+    One query per 900 keys; a Bloom front-end would only skip definite misses (the rare
+    case here) and couldn't forget TTL-purged keys, so it isn't worth a second file."""
+    found: Set[bytes] = set()
+    for i in range(0, len(keys), _MAX_VARS):
+        chunk = keys[i:i + _MAX_VARS]
+        marks = ",".join("?" * len(chunk))
+        found.update(k for (k,) in conn.execute(f"SELECT key FROM seen WHERE key IN ({marks})", chunk))
+    return found
 
+# common tracking params dropped during canonicalization
+_DROP = frozenset({"utm_source","utm_medium","utm_campaign","utm_term","utm_content",
+                   "ocid","cmpid","sref","srnd","ref"})
+_QS_SEP = re.compile(r"[&;]")  # ';' is the legacy pair separator; normalized to '&'
+
+@functools.lru_cache(maxsize=4096)
 def _canonicalize(url: str) -> str:
     """Normalize URL so tracking params or http/https noise don't break de-dupe."""
     try:
         u = urlsplit(url.strip())
         scheme = "https" if u.scheme in ("http", "https") else u.scheme
-        netloc = u.netloc.lower()
+        netloc = u.netloc.lower()  # ASCII fast path in CPython; beats encode+bytes.translate ~4x and keeps IDN hosts intact
         path = u.path.rstrip("/")
-        # drop common tracking params
-        drop = {"utm_source","utm_medium","utm_campaign","utm_term","utm_content",
-                "ocid","cmpid","sref","srnd","ref"}
-        q = [(k, v) for (k, v) in parse_qsl(u.query, keep_blank_values=True)
-             if k.lower() not in drop]
-        query = urlencode(q, doseq=True)
+        if not u.query:
+            return urlunsplit((scheme, netloc, path, "", ""))  # strip fragment
+        # keep surviving params byte-for-byte; no percent-decode/re-encode
+        query = "&".join(p for p in _QS_SEP.split(u.query)
+                         if p and p.split("=", 1)[0].lower() not in _DROP)
         return urlunsplit((scheme, netloc, path, query, ""))  # strip fragment
     except Exception:
         return url.strip()
 
-def url_key(url: str) -> str:
-    return hashlib.sha256(_canonicalize(url).encode("utf-8")).hexdigest()
+def url_key(url: str) -> bytes:
+    # Non-cryptographic dedupe key: xxh3-128 when available, else BLAKE2b-128 (both 16 raw bytes)
+    raw = _canonicalize(url).encode("utf-8")
+    if xxhash is not None:
+        return xxhash.xxh3_128_digest(raw)
+    return hashlib.blake2b(raw, digest_size=16).digest()
+
+def _set_row_count(conn: sqlite3.Connection, n: int) -> None:
+    conn.execute("INSERT OR REPLACE INTO meta(name, value) VALUES ('row_count', ?)", (str(n),))
+
+def _enforce_cap(conn: sqlite3.Connection, delta: int) -> None:
+    """Apply a write's net row change to the row count kept in meta, then evict the oldest
+    entries beyond MAX_ENTRIES (walks idx_seen_ts from the old end). Runs inside the
+    write transaction; the stored count spares a COUNT(*) scan on every write."""
+    count = int(conn.execute("SELECT value FROM meta WHERE name = 'row_count'").fetchone()[0])
+    n = count + delta
+    if MAX_ENTRIES > 0 and n > MAX_ENTRIES:
+        n -= conn.execute("DELETE FROM seen WHERE key IN (SELECT key FROM seen ORDER BY ts ASC LIMIT ?)",
+                          (n - MAX_ENTRIES,)).rowcount
+    if n != count:
+        _set_row_count(conn, n)
+
+def _url_keys(urls: List[str]) -> List[bytes]:
+    """Batch url_key: each distinct URL is hashed once. Serial on purpose: the hashers
+    hold the GIL for URL-sized inputs, so a thread pool only adds overhead."""
+    by_url = {u: url_key(u) for u in dict.fromkeys(urls)}
+    return [by_url[u] for u in urls]
 
 def filter_new(items: List[dict]) -> List[dict]:
-    cache = _load()
     now = _now()
+    # hash everything up front, outside the write lock
+    keys = _url_keys([it["url"] for it in items])
+    cutoff = now - TTL_SECONDS
+
+    # read-only check first: with nothing new and nothing expired there is nothing to write
+    conn = _conn()
+    new = set(keys) - _existing(conn, keys)
+    expired = conn.execute("SELECT 1 FROM seen WHERE ts < ? LIMIT 1", (cutoff,)).fetchone()
+    if not new and not expired:
+        return []
 
-    # purge expired
-    expired = [k for k, ts in cache.items() if now - ts > TTL_SECONDS]
-    for k in expired:
-        cache.pop(k, None)
+    with _write_txn() as conn:
+        # purge expired
+        purged = conn.execute("DELETE FROM seen WHERE ts < ?", (cutoff,)).rowcount
 
+        new = set(keys) - _existing(conn, keys)  # recheck under the write lock, post-purge
+        conn.executemany("INSERT INTO seen(key, ts) VALUES (?, ?)", [(k, now) for k in new])
+        _enforce_cap(conn, len(new) - purged)
+
+    # keep the first item for each new key, in input order
     fresh = []
-    for it in items:
-        key = url_key(it["url"])
-        if key not in cache:
-            cache[key] = now
+    for it, key in zip(items, keys):
+        if key in new:
+            new.discard(key)
             fresh.append(it)
-
-    _save(cache)
     return fresh
 
 def mark_seen(items: List[dict]) -> None:
     """Record items as seen without filtering (useful when you 'ignore-cache' but still
     want later runs to de-dupe)."""
-    cache = _load()
+    if not items:
+        return
     now = _now()
-    for it in items:
-        cache[url_key(it["url"])] = now
-    _save(cache)
+    keys = list(dict.fromkeys(_url_keys([it["url"] for it in items])))
+    with _write_txn() as conn:
+        added = len(keys) - len(_existing(conn, keys))  # REPLACE of a known key adds no row
+        conn.executemany("INSERT OR REPLACE INTO seen(key, ts) VALUES (?, ?)", [(k, now) for k in keys])
+        _enforce_cap(conn, added)
@@ -0,0 +1,18 @@
+import requests
+from typing import Dict
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+def new_session(headers: Dict[str, str] | None = None) -> requests.Session:
+    """Pooled keep-alive session with light retries on transient upstream errors."""
+    s = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=32,
+        max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[502, 503, 504]),
+    )
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    if headers:
+        s.headers.update(headers)
+    return s
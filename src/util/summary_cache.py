@@ -0,0 +1,83 @@
+import sqlite3, time, hashlib, os, functools
+from typing import Callable, Dict, List, Tuple
+
+# Configuration via environment variables
+CACHE_PATH = os.environ.get("SUMMARY_CACHE_PATH", "data/summaries.sqlite")
+TTL_SECONDS = int(os.environ.get("SEEN_TTL_SECONDS", str(72*3600)))  # same horizon as the seen cache
+
+def _now() -> int:
+    return int(time.time())
+
+def _connect() -> sqlite3.Connection:
+    parent = os.path.dirname(CACHE_PATH)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+    # One short-lived connection per call: summaries are written from worker threads
+    conn = sqlite3.connect(CACHE_PATH, timeout=10)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS summaries (key TEXT PRIMARY KEY, summary TEXT NOT NULL, ts INTEGER NOT NULL)"
+    )
+    return conn
+
+def summary_key(title: str, dek: str, source: str) -> str:
+    raw = "\x1f".join((title or "", dek or "", source or "")).encode("utf-8")
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+# The cache is an optimization: a locked DB or unwritable path must not fail the run
+_CACHE_ERRORS = (sqlite3.Error, OSError)
+
+def get_many(keys: List[str]) -> Dict[str, str]:
+    """Return {key: summary} for the keys that have a live (non-expired) entry.
+       Cache errors read as a miss."""
+    if not keys:
+        return {}
+    cutoff = _now() - TTL_SECONDS
+    try:
+        conn = _connect()
+        try:
+            marks = ",".join("?" * len(keys))
+            rows = conn.execute(
+                f"SELECT key, summary FROM summaries WHERE ts >= ? AND key IN ({marks})",
+                (cutoff, *keys),
+            ).fetchall()
+        finally:
+            conn.close()
+    except _CACHE_ERRORS:
+        return {}
+    return dict(rows)
+
+def put_many(rows: List[Tuple[str, str]]) -> None:
+    """Store (key, summary) pairs and drop anything past the TTL.
+       Cache errors skip the write; the summary is just recomputed next run."""
+    if not rows:
+        return
+    now = _now()
+    try:
+        conn = _connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM summaries WHERE ts < ?", (now - TTL_SECONDS,))
+                conn.executemany(
+                    "INSERT OR REPLACE INTO summaries(key, summary, ts) VALUES (?, ?, ?)",
+                    [(k, s, now) for k, s in rows],
+                )
+        finally:
+            conn.close()
+    except _CACHE_ERRORS:
+        pass
+
+def cached(fn: Callable[..., str]) -> Callable[..., str]:
+    """Memoize a (self, title, dek, source) -> summary method on disk.
+       Exceptions propagate uncached, so transient API failures are retried next run.
+    """
+    @functools.wraps(fn)
+    def wrapper(self, title: str, dek: str, source: str) -> str:
+        key = summary_key(title, dek, source)
+        hit = get_many([key]).get(key)
+        if hit is not None:
+            return hit
+        summary = fn(self, title, dek, source)
+        put_many([(key, summary)])
+        return summary
+    return wrapper
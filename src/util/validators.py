@@ -0,0 +1,78 @@
+import os, threading
+import orjson
+from typing import Dict
+
+# Per-feed HTTP validators (ETag / Last-Modified) so unchanged feeds answer 304
+CACHE_PATH = os.environ.get("FEED_VALIDATORS_PATH", "data/feed_validators.json")
+
+_LOCK = threading.Lock()  # feeds are fetched concurrently
+_STATE: Dict[str, Dict[str, str]] | None = None
+_PENDING: Dict[str, Dict[str, str]] = {}  # fetched this run, not yet committed
+
+def _load() -> Dict[str, Dict[str, str]]:
+    if not os.path.exists(CACHE_PATH):
+        return {}
+    try:
+        with open(CACHE_PATH, "rb") as f:
+            return orjson.loads(f.read())
+    except Exception:
+        return {}
+
+def _save(d: Dict[str, Dict[str, str]]) -> None:
+    parent = os.path.dirname(CACHE_PATH)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+    # write-then-rename so a crash mid-write never leaves a truncated file behind
+    tmp = CACHE_PATH + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(orjson.dumps(d))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, CACHE_PATH)
+
+def _state() -> Dict[str, Dict[str, str]]:
+    global _STATE
+    if _STATE is None:
+        _STATE = _load()
+    return _STATE
+
+def conditional_headers(url: str, scope: str) -> Dict[str, str]:
+    """If-None-Match / If-Modified-Since for the last committed fetch of url.
+       Validators stored under a different scope (ingest settings) are ignored: a 304
+       only means "nothing new" if that run kept the same entries we would keep now.
+    """
+    with _LOCK:
+        v = _state().get(url) or {}
+    if v.get("scope") != scope:
+        return {}
+    h = {}
+    if v.get("etag"):
+        h["If-None-Match"] = v["etag"]
+    if v.get("last_modified"):
+        h["If-Modified-Since"] = v["last_modified"]
+    return h
+
+def remember(url: str, etag: str | None, last_modified: str | None) -> None:
+    """Stage the validators a server sent back; nothing is written until commit()."""
+    new = {k: v for k, v in (("etag", etag), ("last_modified", last_modified)) if v}
+    with _LOCK:
+        _PENDING[url] = new
+
+def commit(scope: str) -> None:
+    """Persist staged validators under scope. Call only once the fetched items are
+       recorded as seen, otherwise a later 304 would hide entries never delivered."""
+    with _LOCK:
+        st = _state()
+        changed = False
+        for url, new in _PENDING.items():
+            entry = {**new, "scope": scope} if new else None
+            if st.get(url) == entry:
+                continue
+            if entry:
+                st[url] = entry
+            else:
+                st.pop(url, None)
+            changed = True
+        _PENDING.clear()
+        if changed:
+            _save(st)